@@ -1,158 +1,349 @@
 import os
-import boto3
-import requests
+import atexit
+import queue
+import asyncio
+import aioboto3
+import httpx
 import pandas as pd
+import pyarrow as pa
+from pyarrow import csv as pa_csv
 from tqdm import tqdm
-import subprocess
-from botocore.exceptions import NoCredentialsError, ClientError
-from datetime import datetime
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
+from botocore.exceptions import BotoCoreError, NoCredentialsError, ClientError
 import re
-import time
 import logging
+from logging.handlers import QueueHandler, QueueListener
 from dotenv import load_dotenv
 
 # 環境変数の読み込み
 load_dotenv()
 
-# ログの設定
-logging.basicConfig(
-    filename='./log/download_upload.log',
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
+# ログの設定（ファイルへの書き込みはQueueListenerのスレッドで行い、転送処理を待たせない）
+log_queue = queue.Queue(-1)
+file_handler = logging.FileHandler('./log/download_upload.log')
+file_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+log_listener = QueueListener(log_queue, file_handler)
+logging.getLogger().addHandler(QueueHandler(log_queue))
+logging.getLogger().setLevel(logging.INFO)
+logging.getLogger('httpx').setLevel(logging.WARNING)  # リクエストごとのINFOログを抑制
+log_listener.start()
+atexit.register(log_listener.stop)  # 終了時にキューに残ったログを書き出す
 
 # 設定部分
 S3_BUCKET_NAME = 'dermsplanner-dev-bucket-weather-prediction-data-491085428607'  # 置き換えてください
 S3_STORAGE_CLASS = 'STANDARD'             # 例: 'STANDARD', 'GLACIER', 'DEEP_ARCHIVE' など
 DOWNLOAD_DIR = './data/output/'                # ローカルのダウンロードディレクトリ
 CSV_FILE_PATH = './data/input/ods_download_url.csv'                # URLリストが含まれるCSVファイルのパス
-RETRIES = 1                                # ダウンロード・アップロードの再試行回数
-BACKOFF_FACTOR = 5                         # 再試行時のバックオフ時間（秒）
+RETRIES = 5                                # ダウンロードの再試行回数
+BACKOFF_FACTOR = 1                         # ダウンロード再試行時の指数バックオフの基準時間（秒）
+S3_MAX_ATTEMPTS = 10                       # S3リクエストの最大試行回数（botocoreのadaptiveモード）
+DOWNLOAD_WORKERS = 32                      # 同時にダウンロードするファイル数
+UPLOAD_WORKERS = 8                         # 同時にS3へアップロードするファイル数
+UPLOAD_QUEUE_SIZE = 64                     # ダウンロード済みでアップロード待ちにできるファイル数の上限
+UPLOAD_CONCURRENCY = 10                    # 1ファイルあたりのマルチパートの同時アップロード数
+UPLOAD_PART_SIZE = 16 * 1024 * 1024        # マルチパートアップロードの1パートのサイズ
 
 # 環境変数からAPIキーを取得
 API_KEY = os.getenv('API_KEY')
 if not API_KEY:
     raise ValueError("API_KEY 環境変数が設定されていません。")
 
-# S3クライアントの作成
-s3_client = boto3.client('s3')
+# S3クライアントの設定（全アップロードのパートを同時に送れるよう接続プールを拡張）
+# 再試行はbotocoreのadaptiveモードに任せ、ジッター付き指数バックオフとスロットリング時の送信抑制を行う
+S3_CONFIG = Config(
+    retries={'max_attempts': S3_MAX_ATTEMPTS, 'mode': 'adaptive'},
+    max_pool_connections=max(32, UPLOAD_CONCURRENCY * UPLOAD_WORKERS)
+)
+
+# ダウンロードしたファイルをS3へマルチパートで並列アップロードする設定
+TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=8 * 1024 * 1024,
+    multipart_chunksize=UPLOAD_PART_SIZE,
+    max_concurrency=UPLOAD_CONCURRENCY,
+    # 1パート分を1回のreadで読み込み、256KB単位の細かいread（とスレッドの往復）を避ける
+    io_chunksize=UPLOAD_PART_SIZE
+)
+
+# ダウンロードのタイムアウト（接続5秒、受信待ち300秒）と再試行するHTTPステータス
+# 接続プールの空き待ちは他のダウンロードが終わるのを待っているだけなので、タイムアウトさせない
+HTTP_TIMEOUT = httpx.Timeout(300.0, connect=5.0, pool=None)
+RETRY_STATUSES = {429, 500, 502, 503, 504}
 
-def parse_period(period_str):
+# '期間'フィールドから開始日・終了日の年月日を抽出する正規表現
+_PERIOD_RE = re.compile(r'(\d{4})年(\d{1,2})月(\d{1,2})日.*?(\d{4})年(\d{1,2})月(\d{1,2})日')
+
+def format_periods(periods):
     """
-    '期間'フィールドを 'YYYYMMDD-YYYYMMDD' の形式に変換します。
+    '期間'列をまとめて 'YYYYMMDD-YYYYMMDD' の形式に変換します。
     例: '2024年6月28日～2024年6月30日' -> '20240628-20240630'
+    期待されるフォーマットでない行や存在しない日付の行はNaNになります。
+    """
+    # 正規表現で開始日・終了日の年月日を抽出（一致しない行はNaN）
+    parts = periods.str.extract(_PERIOD_RE)
+    numbers = parts.astype(float)
+    date_columns = ['year', 'month', 'day']
+    start = pd.to_datetime(numbers[[0, 1, 2]].set_axis(date_columns, axis=1), errors='coerce')
+    end = pd.to_datetime(numbers[[3, 4, 5]].set_axis(date_columns, axis=1), errors='coerce')
+
+    # 日付の妥当性はto_datetimeで確認し、文字列は抽出済みの数字をゼロ埋めして組み立てる
+    formatted = (
+        parts[0] + parts[1].str.zfill(2) + parts[2].str.zfill(2)
+        + '-'
+        + parts[3] + parts[4].str.zfill(2) + parts[5].str.zfill(2)
+    )
+    return formatted.where(start.notna() & end.notna())
+
+def get_retry_after(response):
     """
+    レスポンスのRetry-Afterヘッダーを待機秒数に変換します。
+    ヘッダーがない場合や解釈できない場合はNoneを返します。
+    """
+    value = response.headers.get('Retry-After')
+    if value is None:
+        return None
     try:
-        # 正規表現で日付部分を抽出
-        dates = re.findall(r'(\d{4})年(\d{1,2})月(\d{1,2})日', period_str)
-        if len(dates) != 2:
-            logging.error(f"期待される期間フォーマットではありません。期間: {period_str}")
-            return None
-        start_date = datetime(int(dates[0][0]), int(dates[0][1]), int(dates[0][2]))
-        end_date = datetime(int(dates[1][0]), int(dates[1][1]), int(dates[1][2]))
-        formatted_period = f"{start_date.strftime('%Y%m%d')}-{end_date.strftime('%Y%m%d')}"
-        return formatted_period
-    except Exception as e:
-        logging.error(f"期間のパース中にエラーが発生しました。期間: {period_str} エラー: {e}")
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
         return None
 
-def download_file(url, download_path, retries=3, backoff_factor=5):
+@asynccontextmanager
+async def open_download(http_client, url):
+    """
+    URLのダウンロードを開始し、本文を読み出せるレスポンスを返します。
+    429/5xxや接続エラーの場合は、Retry-Afterまたは指数バックオフの時間だけ待機して再試行します。
+    待機中はイベントループを止めないため、他のファイルの転送は続行されます。
+    """
+    for attempt in range(RETRIES + 1):
+        try:
+            request = http_client.build_request('GET', url, headers={'x-api-key': API_KEY})
+            response = await http_client.send(request, stream=True)
+        except httpx.TransportError as e:
+            if attempt == RETRIES:
+                raise
+            wait = BACKOFF_FACTOR * 2 ** attempt
+            logging.warning(f"ダウンロード失敗: {url} エラー: {e}。{wait}秒後に再試行します... (Attempt {attempt + 2}/{RETRIES + 1})")
+        else:
+            if response.status_code not in RETRY_STATUSES or attempt == RETRIES:
+                break
+            await response.aclose()
+            retry_after = get_retry_after(response)
+            wait = retry_after if retry_after is not None else BACKOFF_FACTOR * 2 ** attempt
+            logging.warning(f"ダウンロード失敗: {url} ステータス: {response.status_code}。{wait}秒後に再試行します... (Attempt {attempt + 2}/{RETRIES + 1})")
+        await asyncio.sleep(wait)
+
+    try:
+        response.raise_for_status()
+        yield response
+    finally:
+        await response.aclose()
+
+async def download_file(http_client, url, download_path):
     """
     ファイルをダウンロードし、指定されたパスに保存します。
-    再試行機能を含みます。
-    curlを使用してダウンロードを実行します。
+    受信中は '.part' の一時ファイルに書き込み、完了してから本来のパスへ置き換えるため、
+    中断しても壊れたファイルが残りません。
+    前回の実行で保存済みのファイルがある場合は再ダウンロードしません。
     """
-    for attempt in range(1, retries + 1):
+    if os.path.exists(download_path):
+        logging.debug(f"ダウンロード済みのファイルを使用します。{download_path}")
+        return True
+
+    part_path = download_path + '.part'
+    try:
+        async with open_download(http_client, url) as response:
+            with open(part_path, 'wb') as f:
+                async for chunk in response.aiter_bytes(1024 * 1024):
+                    await asyncio.to_thread(f.write, chunk)
+        os.replace(part_path, download_path)
+        logging.debug(f"ダウンロード完了: {url}")
+        return True
+    except (httpx.HTTPError, httpx.InvalidURL, OSError) as e:
+        logging.error(f"ファイルのダウンロード中にエラーが発生しました。URL: {url} エラー: {e}")
         try:
-            logging.info(f"ダウンロード試行 {attempt}/{retries} - URL: {url}")
-            # curlコマンドの作成
-            curl_command = [
-                'curl',
-                '-L',  # リダイレクトを追跡
-                url,
-                '-H', f'x-api-key: {API_KEY}',
-                '-o', download_path,
-                '-f',  # HTTPエラー時に失敗として扱う
-                '--retry', '0'  # curl自身の再試行を無効化
-            ]
-
-            # subprocessでcurlを実行
-            result = subprocess.run(curl_command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-
-            if result.returncode == 0:
-                logging.info(f"ダウンロード完了: {url}")
-                return True
-            else:
-                error_message = result.stderr.decode().strip()
-                logging.error(f"curlエラー: {error_message}")
-                raise subprocess.CalledProcessError(result.returncode, curl_command, output=result.stdout, stderr=result.stderr)
-        except subprocess.CalledProcessError as e:
-            if attempt < retries:
-                wait = backoff_factor * attempt
-                logging.warning(f"ダウンロード失敗: {url}。{wait}秒後に再試行します... (Attempt {attempt + 1}/{retries})")
-                time.sleep(wait)
-            else:
-                logging.error(f"最大再試行回数に達しました。URL: {url}")
-                return False
-        except Exception as e:
-            logging.error(f"ファイルのダウンロード中に予期せぬエラーが発生しました。URL: {url} エラー: {e}")
-            if attempt < retries:
-                wait = backoff_factor * attempt
-                logging.info(f"{wait}秒後に再試行します... (Attempt {attempt + 1}/{retries})")
-                time.sleep(wait)
-            else:
-                logging.error(f"最大再試行回数に達しました。URL: {url}")
-                return False
-
-def upload_to_s3(file_path, bucket, s3_key, storage_class='STANDARD', retries=3, backoff_factor=5):
+            os.remove(part_path)
+        except OSError:
+            pass
+        return False
+
+async def upload_to_s3(s3_client, file_path, bucket, s3_key, storage_class='STANDARD'):
     """
     S3にファイルをアップロードします。
-    再試行機能を含みます。
+    8MBを超える場合はマルチパートに分割し、パートを並列にアップロードします。
     """
-    for attempt in range(1, retries + 1):
-        try:
-            s3_client.upload_file(
-                Filename=file_path,
-                Bucket=bucket,
-                Key=s3_key,
-                ExtraArgs={'StorageClass': storage_class}
-            )
-            logging.info(f"アップロード完了: {s3_key}")
-            return True
-        except FileNotFoundError:
-            logging.error(f"ファイルが見つかりません。{file_path}")
-            return False
-        except NoCredentialsError:
-            logging.error("AWS認証情報が見つかりません。")
-            return False
-        except ClientError as e:
-            logging.error(f"S3へのアップロード中にエラーが発生しました。{e}")
-            if attempt < retries:
-                wait = backoff_factor * attempt
-                logging.info(f"{wait}秒後に再試行します... (Attempt {attempt + 1}/{retries})")
-                time.sleep(wait)
-            else:
-                logging.error(f"最大再試行回数に達しました。S3キー: {s3_key}")
-                return False
+    try:
+        await s3_client.upload_file(
+            Filename=file_path,
+            Bucket=bucket,
+            Key=s3_key,
+            ExtraArgs={'StorageClass': storage_class},
+            Config=TRANSFER_CONFIG
+        )
+        logging.debug(f"アップロード完了: {s3_key}")
+        return True
+    except FileNotFoundError:
+        logging.error(f"ファイルが見つかりません。{file_path}")
+        return False
+    except NoCredentialsError:
+        logging.error("AWS認証情報が見つかりません。")
+        return False
+    except (ClientError, BotoCoreError) as e:
+        logging.error(f"S3へのアップロード中にエラーが発生しました。{e}")
+        return False
+
+async def list_existing_keys(s3_client, bucket):
+    """
+    バケット内の既存オブジェクトのキーを一覧で取得します。
+    list_objects_v2は1リクエストで最大1000件を返すため、ファイルごとに確認するより少ない往復で済みます。
+    """
+    try:
+        paginator = s3_client.get_paginator('list_objects_v2')
+        keys = set()
+        async for page in paginator.paginate(Bucket=bucket):
+            keys.update(obj['Key'] for obj in page.get('Contents', []))
+        return keys
+    except NoCredentialsError:
+        logging.error("AWS認証情報が見つかりません。")
+        return set()
+    except (ClientError, BotoCoreError) as e:
+        logging.error(f"S3の既存オブジェクトの取得中にエラーが発生しました。{e}")
+        return set()
 
 def read_urls_from_csv(csv_path):
     """
     CSVファイルからURLリストと関連情報を読み込みます。
+    各レコードは列名を英語にし、アップロード先のファイル名 (file_name) と
+    ダウンロード先のパス (download_path) を加えたnamedtupleとして返します。
     """
     try:
-        df = pd.read_csv(csv_path, encoding='shift-jis', dtype=str)
         required_columns = ['配信履歴ID', 'データ名', '期間', 'URL', '有効期限']
+        header = pd.read_csv(csv_path, encoding='shift-jis', nrows=0).columns
         for col in required_columns:
-            if col not in df.columns:
+            if col not in header:
                 logging.error(f"CSVファイルに '{col}' 列が見つかりません。")
                 return []
-        df = df.dropna(subset=['配信履歴ID', '期間', 'URL', '有効期限'])
-        return df.to_dict('records')
+        # 必要な列だけをpyarrowでArrowの文字列配列として読み込む
+        # 型推論させると配信履歴IDが整数になり先頭の0が落ちるため、読み込み時点で文字列型を指定する
+        table = pa_csv.read_csv(
+            csv_path,
+            read_options=pa_csv.ReadOptions(encoding='shift-jis'),
+            convert_options=pa_csv.ConvertOptions(
+                column_types={col: pa.string() for col in required_columns},
+                include_columns=required_columns,
+                strings_can_be_null=True
+            )
+        )
+        df = table.to_pandas(types_mapper={pa.string(): pd.StringDtype('pyarrow')}.get)
+        # レコードを属性で参照できるよう列名を英語に変換
+        df = df.rename(columns={
+            '配信履歴ID': 'delivery_id',
+            'データ名': 'data_name',
+            '期間': 'period',
+            'URL': 'url',
+            '有効期限': 'expiration'
+        })
+        df = df.dropna(subset=['delivery_id', 'period', 'url', 'expiration'])
+        df['formatted_period'] = format_periods(df['period'])
+
+        # 期間を変換できずファイル名を生成できない行はまとめて除外
+        invalid = df[df['formatted_period'].isna()]
+        if not invalid.empty:
+            print(f"WARNING: 期間のフォーマットに問題があるため、ファイル名を生成できないレコードをスキップします。件数: {len(invalid)}")
+            logging.warning(f"期待される期間フォーマットではないレコードをスキップします。件数: {len(invalid)} 配信履歴ID: {invalid['delivery_id'].tolist()}")
+            df = df.dropna(subset=['formatted_period'])
+
+        # ファイル名の生成
+        df['file_name'] = df['delivery_id'] + '_' + df['formatted_period'] + '.zip'
+        df['download_path'] = DOWNLOAD_DIR + df['file_name']
+
+        # 同じファイル名になる重複行は1回だけダウンロード
+        duplicated = df['file_name'].duplicated()
+        if duplicated.any():
+            print(f"INFO: 重複しているためスキップするレコード数: {duplicated.sum()}")
+            logging.info(f"重複しているためスキップするレコード数: {duplicated.sum()}")
+            df = df[~duplicated]
+
+        # 同じホストへのリクエストが続くよう並べ替え、接続を使い回しやすくする
+        df['host'] = df['url'].str.extract(r'://([^/]+)', expand=False)
+        df = df.sort_values('host', kind='stable')
+        return list(df.itertuples(index=False, name='Record'))
     except Exception as e:
         logging.error(f"CSVファイルの読み込み中にエラーが発生しました。{e}")
         return []
 
-def main():
+async def download_worker(http_client, download_queue, upload_queue, total_files, progress):
+    """
+    download_queueから取り出したレコードのファイルをダウンロードし、upload_queueへ渡します。
+    Noneを受け取ると終了し、ダウンロードに失敗したファイル数を返します。
+    """
+    failures = 0
+    while True:
+        item = await download_queue.get()
+        if item is None:
+            return failures
+        idx, record = item
+
+        logging.debug(f"[{idx}/{total_files}] 開始: {record.file_name} のダウンロード, URL: {record.url}")
+        success = await download_file(http_client, record.url, record.download_path)
+        if not success:
+            logging.warning(f"ダウンロードに失敗しました。スキップします。URL: {record.url}")
+            failures += 1
+            progress.update(1)
+            continue
+
+        # アップロードが詰まっている間はここで待機し、未アップロードのファイルが溜まり過ぎないようにする
+        await upload_queue.put(item)
+
+async def upload_worker(s3_client, upload_queue, total_files, progress):
+    """
+    upload_queueから取り出したダウンロード済みのファイルをS3へアップロードし、ローカルファイルを削除します。
+    Noneを受け取ると終了し、アップロードに失敗したファイル数を返します。
+    """
+    failures = 0
+    while True:
+        item = await upload_queue.get()
+        if item is None:
+            return failures
+        idx, record = item
+
+        logging.debug(f"[{idx}/{total_files}] 開始: {record.file_name} のS3へのアップロード, S3キー: {record.file_name}")
+        s3_key = record.file_name  # 必要に応じてS3上のパスを変更可能
+        upload_success = await upload_to_s3(s3_client, record.download_path, S3_BUCKET_NAME, s3_key, S3_STORAGE_CLASS)
+        if not upload_success:
+            logging.warning(f"アップロードに失敗しました。ローカルファイルを保持します。{record.download_path}")
+            failures += 1
+            progress.update(1)
+            continue
+
+        # アップロードが成功したらローカルファイルを削除
+        try:
+            os.remove(record.download_path)
+            logging.debug(f"[{idx}/{total_files}] 削除: ローカルファイルを削除しました。{record.download_path}")
+        except OSError as e:
+            logging.warning(f"ローカルファイルの削除中にエラーが発生しました。{record.download_path} エラー: {e}")
+        progress.update(1)
+
+async def run_download_workers(http_client, download_queue, upload_queue, total_files, progress):
+    """
+    DOWNLOAD_WORKERS個のダウンロードワーカーを実行し、全て終わったらアップロードワーカーに終了を通知します。
+    ダウンロードに失敗したファイル数の合計を返します。
+    """
+    failures = await asyncio.gather(*(
+        download_worker(http_client, download_queue, upload_queue, total_files, progress)
+        for _ in range(DOWNLOAD_WORKERS)
+    ))
+    for _ in range(UPLOAD_WORKERS):
+        await upload_queue.put(None)
+    return sum(failures)
+
+async def main():
     # ダウンロードディレクトリが存在しない場合は作成
     if not os.path.exists(DOWNLOAD_DIR):
         os.makedirs(DOWNLOAD_DIR)
@@ -169,49 +360,40 @@ def main():
     print(f"INFO: 処理するファイル数: {total_files}")
     logging.info(f"処理するファイル数: {total_files}")
 
-    for idx, record in enumerate(records, start=1):
-        delivery_id = record['配信履歴ID']
-        period_str = record['期間']
-        url = record['URL']
-        expiration = record['有効期限']  # 現在は使用していませんが、必要に応じて使用可能
+    s3_session = aioboto3.Session()
+    # 本文は署名付きURLのS3からHTTP/1.1で返され多重化できないため、ワーカーごとに接続を持てるようにする
+    # HTTP/2に対応したAPIサーバーへのリクエストは1本の接続に多重化される
+    limits = httpx.Limits(max_connections=DOWNLOAD_WORKERS, max_keepalive_connections=DOWNLOAD_WORKERS)
+    # APIは署名付きURLへリダイレクトするため、リダイレクトを追跡する
+    async with s3_session.client('s3', config=S3_CONFIG) as s3_client, \
+            httpx.AsyncClient(http2=True, limits=limits, timeout=HTTP_TIMEOUT, follow_redirects=True) as http_client:
+        # アップロード済みのファイルは再ダウンロードしない
+        existing_keys = await list_existing_keys(s3_client, S3_BUCKET_NAME)
+        pending_records = [record for record in records if record.file_name not in existing_keys]
+        skipped = len(records) - len(pending_records)
+        if skipped:
+            print(f"INFO: S3にアップロード済みのためスキップするファイル数: {skipped}")
+            logging.info(f"S3にアップロード済みのためスキップするファイル数: {skipped}")
 
-        # '期間' を 'YYYYMMDDHHMM-YYYYMMDDHHMM' に変換
-        try:
-            formatted_expiration = parse_period(period_str)
-        except ValueError as ve:
-            logging.error(f"有効期限のフォーマットエラー: {expiration} エラー: {ve}")
-            print(f"WARNING: 有効期限のフォーマットに問題があるため、ファイル名を生成できません。スキップします。配信履歴ID: {delivery_id}")
-            continue
-
-        # ファイル名の生成
-        file_name = f"{delivery_id}_{formatted_expiration}.zip"
-        download_path = os.path.join(DOWNLOAD_DIR, file_name)
+        # ダウンロードとアップロードを別々のワーカーで並行させ、キューで受け渡す
+        total = len(pending_records)
+        download_queue = asyncio.Queue()
+        for item in enumerate(pending_records, start=1):
+            download_queue.put_nowait(item)
+        for _ in range(DOWNLOAD_WORKERS):
+            download_queue.put_nowait(None)
+        upload_queue = asyncio.Queue(maxsize=UPLOAD_QUEUE_SIZE)
 
-        print(f"\n[{idx}/{total_files}] 開始: {file_name} のダウンロード")
-        logging.info(f"[{idx}/{total_files}] 開始: {file_name} のダウンロード, URL: {url}")
-        success = download_file(url, download_path, retries=RETRIES, backoff_factor=BACKOFF_FACTOR)
-        if not success:
-            print(f"WARNING: ダウンロードに失敗しました。スキップします。URL: {url}")
-            logging.warning(f"ダウンロードに失敗しました。スキップします。URL: {url}")
-            continue
-
-        print(f"[{idx}/{total_files}] 開始: {file_name} のS3へのアップロード")
-        logging.info(f"[{idx}/{total_files}] 開始: {file_name} のS3へのアップロード, S3キー: {file_name}")
-        s3_key = file_name  # 必要に応じてS3上のパスを変更可能
-        upload_success = upload_to_s3(download_path, S3_BUCKET_NAME, s3_key, S3_STORAGE_CLASS, retries=RETRIES, backoff_factor=BACKOFF_FACTOR)
-        if not upload_success:
-            print(f"WARNING: アップロードに失敗しました。ローカルファイルを保持します。{download_path}")
-            logging.warning(f"アップロードに失敗しました。ローカルファイルを保持します。{download_path}")
-            continue
+        # 処理中のコンソール出力は進捗バーのみとし、個々の失敗はログに記録する
+        with tqdm(total=total, desc='files') as progress:
+            failures = await asyncio.gather(
+                run_download_workers(http_client, download_queue, upload_queue, total, progress),
+                *(upload_worker(s3_client, upload_queue, total, progress) for _ in range(UPLOAD_WORKERS))
+            )
 
-        # アップロードが成功したらローカルファイルを削除
-        try:
-            os.remove(download_path)
-            print(f"[{idx}/{total_files}] 削除: ローカルファイルを削除しました。{download_path}")
-            logging.info(f"[{idx}/{total_files}] 削除: ローカルファイルを削除しました。{download_path}")
-        except OSError as e:
-            print(f"WARNING: ローカルファイルの削除中にエラーが発生しました。{download_path} エラー: {e}")
-            logging.warning(f"ローカルファイルの削除中にエラーが発生しました。{download_path} エラー: {e}")
+    failed = sum(failures)
+    print(f"INFO: 処理が完了しました。成功: {total - failed} 件, 失敗: {failed} 件")
+    logging.info(f"処理が完了しました。成功: {total - failed} 件, 失敗: {failed} 件")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    asyncio.run(main())
\ No newline at end of file